@@ -4,13 +4,28 @@ A Streamlit app for analyzing contracts using AI and highlighting risks.
 """
 
 import streamlit as st
-import pandas as pd
 import json
 import os
-from typing import List
-from parsers_llm import extract_text, detect_contract_type, detect_country, convert_text_to_markdown, clean_text, extract_key_clauses, analyze_contract_full
-from exa_search import search_regulatory_hints
-from chain import llm_review, RiskItem
+import hashlib
+import html
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+# The parsing and LLM modules pull in langchain, openai and the PDF/DOCX
+# libraries; they are imported where used so the page paints first
+if TYPE_CHECKING:
+    from chain import RiskItem
+
+# Sample NDA and its precomputed analysis; the analysis is only present once
+# scripts/generate_sample.py has been run against the real model
+SAMPLE_TEXT_PATH = Path(__file__).parent / "assets" / "sample_nda.txt"
+SAMPLE_ANALYSIS_PATH = Path(__file__).parent / "assets" / "sample_nda_analysis.json"
 
 # Page configuration
 st.set_page_config(
@@ -37,6 +52,9 @@ st.markdown("""
         border-left: 4px solid #1f77b4;
         margin: 1rem 0;
     }
+    .contract-text {
+        white-space: pre-wrap;
+    }
     .risk-high {
         background-color: #ffebee;
         border-left: 4px solid #f44336;
@@ -61,36 +79,294 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def highlight_risks_in_text(text: str, risks: List[RiskItem]) -> str:
+def content_hash(data: bytes) -> str:
+    """Compute a compact content hash used as a cache key."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """Compute a compact content hash used as the cache key for a contract."""
+    return content_hash(text.encode())
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_extract(file_hash: str, filename: str, _data: bytes) -> Tuple[str, Dict]:
+    from parsers_llm import extract_text_from_bytes, clean_text
+    text, meta = extract_text_from_bytes(_data, filename)
+    return clean_text(text), meta
+
+
+# LLM results are cached on the content hash; the underscore-prefixed text
+# argument is skipped by Streamlit's hasher so large contracts aren't rehashed
+@st.cache_data(show_spinner=False, max_entries=128, ttl=3600)
+def _cached_analyze(text_hash: str, _text: str, _on_progress: Optional[Callable[[str], None]] = None) -> Dict:
+    from parsers_llm import analyze_contract_full
+    return analyze_contract_full(_text, on_progress=_on_progress)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_markdown(text_hash: str, _text: str, title: str) -> str:
+    from parsers_llm import convert_text_to_markdown
+    return convert_text_to_markdown(_text, title)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_report_json(text_hash: str, filename: str, contract_type: str, country: str,
+                        key_clauses: Tuple[str, ...], risks: Tuple["RiskItem", ...]) -> str:
+    # The analysis date is when the report was first built for these results
+    from chain import AnalysisReport, ContractAnalysisSummary, RiskSummary
+    
+    report = AnalysisReport(
+        contract_analysis=ContractAnalysisSummary(
+            filename=filename,
+            contract_type=contract_type,
+            governing_law=country,
+            key_clauses=list(key_clauses),
+            analysis_date=datetime.now()
+        ),
+        risks=list(risks),
+        summary=RiskSummary.from_risks(list(risks))
+    )
+    return report.model_dump_json(indent=2)
+
+
+class _RiskReviewCache:
+    """
+    Finished LLM risk reviews, shared across sessions and expiring after ttl seconds.
+    
+    Written from executor threads and read from script threads, so every
+    access holds the lock.
+    """
+    
+    def __init__(self, max_entries: int = 128, ttl: float = 3600):
+        self._entries: "OrderedDict[Tuple, Tuple[float, List[RiskItem]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._ttl = ttl
+    
+    def get(self, key: Tuple) -> Optional[List["RiskItem"]]:
+        """Return the risks stored under key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, risks = entry
+            if time.monotonic() - stored_at > self._ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return risks
+    
+    def put(self, key: Tuple, risks: List["RiskItem"]):
+        """Store risks under key, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), risks)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def _risk_review_cache() -> _RiskReviewCache:
+    # Shared across sessions; filled as background reviews complete
+    return _RiskReviewCache()
+
+
+@st.cache_resource
+def _executor() -> ThreadPoolExecutor:
+    # LLM reviews run here so a blocked model call never freezes a session
+    return ThreadPoolExecutor(max_workers=8)
+
+
+def _run_review_job(cache: _RiskReviewCache, cache_key: Tuple, text: str, contract_type: str, country: str,
+                    regulatory_hints: Tuple[str, ...], partial: List["RiskItem"],
+                    cancel: threading.Event) -> Optional[List["RiskItem"]]:
+    """Stream the LLM review on a worker thread, publishing risks into partial."""
+    from chain import analysis_error_risk, stream_llm_review
+    
+    for risk in stream_llm_review(text, contract_type, country, regulatory_hints):
+        if cancel.is_set():
+            return None
+        partial.append(risk)
+    
+    risks = list(partial)
+    # A failed review is shown once but not cached, so the next visit retries it
+    if analysis_error_risk() not in risks:
+        cache.put(cache_key, risks)
+    return risks
+
+
+def _poll_llm_review(text_hash: str, contract_type: str, country: str, regulatory_hints: Tuple[str, ...], text: str) -> Optional[List["RiskItem"]]:
+    """
+    Start or poll this session's background LLM risk review.
+    
+    A cached review always wins, even over an earlier cancellation of the
+    same contract's review.
+    
+    Returns:
+        Optional[List[RiskItem]]: The risks once the review has finished,
+            or None while it is still running or after it was cancelled
+    """
+    cache = _risk_review_cache()
+    cache_key = (text_hash, contract_type, country, regulatory_hints)
+    job = st.session_state.get("llm_review_job")
+    risks = cache.get(cache_key)
+    if risks is not None:
+        # The job that filled the cache may not have returned yet, but it is
+        # finished; a job for another contract is no longer wanted
+        if job is not None:
+            if job["key"] == cache_key:
+                del st.session_state["llm_review_job"]
+            else:
+                _cancel_llm_review()
+        if st.session_state.get("llm_review_cancelled") == cache_key:
+            del st.session_state["llm_review_cancelled"]
+        return risks
+    
+    if st.session_state.get("llm_review_cancelled") == cache_key:
+        return None
+    
+    if job is None or job["key"] != cache_key:
+        if job is not None:
+            _cancel_llm_review()
+        job = {"key": cache_key, "risks": [], "cancel": threading.Event()}
+        job["future"] = _executor().submit(
+            _run_review_job, cache, cache_key, text, contract_type, country,
+            regulatory_hints, job["risks"], job["cancel"]
+        )
+        st.session_state["llm_review_job"] = job
+    
+    if not job["future"].done():
+        return None
+    
+    del st.session_state["llm_review_job"]
+    return job["future"].result()
+
+
+def _cancel_llm_review():
+    """Cancel this session's background LLM risk review, if it is still running."""
+    job = st.session_state.pop("llm_review_job", None)
+    if job is not None and not job["future"].done():
+        job["cancel"].set()
+        job["future"].cancel()
+        st.session_state["llm_review_cancelled"] = job["key"]
+
+
+@st.cache_data(show_spinner=False)
+def load_sample_text() -> str:
+    """Load the sample NDA text."""
+    return SAMPLE_TEXT_PATH.read_text(encoding="utf-8").strip()
+
+
+@st.cache_data(show_spinner=False)
+def load_sample_analysis() -> Dict:
+    """Load the precomputed sample NDA analysis into the pipeline's result types."""
+    from chain import RiskItem
+    from llm_analyzer import ClauseInfo, ClauseRiskAssessment
+    
+    data = json.loads(SAMPLE_ANALYSIS_PATH.read_text(encoding="utf-8"))
+    return {
+        "text": data["text"],
+        "analysis_results": {
+            "contract_type": data["contract_type"],
+            "governing_law": data["governing_law"],
+            "key_clauses": {k: ClauseInfo(**v) for k, v in data["key_clauses"].items()},
+            "clause_risks": {k: ClauseRiskAssessment(**v) for k, v in data["clause_risks"].items()}
+        },
+        "risks": [RiskItem(**risk) for risk in data["risks"]]
+    }
+
+
+# Highlight colors and precedence for overlapping risk spans
+RISK_COLORS = {
+    "high": "#ffcdd2",
+    "medium": "#ffe0b2",
+    "low": "#f3e5f5"
+}
+RISK_SEVERITY = {"high": 3, "medium": 2, "low": 1}
+
+RISK_ICONS = {"high": "🔴", "medium": "🟠", "low": "🟡"}
+
+_WS_RE = re.compile(r'\s+')
+
+
+def highlight_risks_in_text(text: str, risks: List["RiskItem"]) -> str:
     """
     Highlight risky text segments with color coding.
     
+    Risk quotes are matched whitespace-insensitively, since the model often
+    reflows line breaks in the text it quotes.
+    
     Args:
         text: Original contract text
         risks: List of identified risks
         
     Returns:
-        str: HTML with highlighted text
+        str: HTML with highlighted text; the contract text itself is escaped
     """
-    highlighted_text = text
+    # Normalize each quote once; the most severe risk wins for repeated quotes
+    needles = {}
+    for risk in risks:
+        needle = _WS_RE.sub(' ', risk.text).strip()
+        if not needle:
+            continue
+        current = needles.get(needle)
+        if current is None or RISK_SEVERITY.get(risk.risk_level, 0) > RISK_SEVERITY.get(current.risk_level, 0):
+            needles[needle] = risk
     
-    # Sort risks by position to avoid overlapping highlights
-    sorted_risks = sorted(risks, key=lambda x: text.find(x.text) if x.text in text else 0, reverse=True)
+    if not needles:
+        return html.escape(text)
     
-    for risk in sorted_risks:
-        if risk.text in highlighted_text:
-            color = {
-                "high": "#ffcdd2",
-                "medium": "#ffe0b2", 
-                "low": "#f3e5f5"
-            }.get(risk.risk_level, "#f3e5f5")
-            
-            highlighted_text = highlighted_text.replace(
-                risk.text,
-                f'<mark style="background-color: {color}; padding: 2px 4px; border-radius: 3px;">{risk.text}</mark>'
-            )
+    # One alternation over all quotes (longest first) finds every span in a
+    # single left-to-right pass; whitespace in a quote matches any whitespace run
+    pattern = re.compile('|'.join(
+        r'\s+'.join(map(re.escape, needle.split(' ')))
+        for needle in sorted(needles, key=len, reverse=True)
+    ))
     
-    return highlighted_text
+    out = []
+    i = 0
+    for match in pattern.finditer(text):
+        matched = _WS_RE.sub(' ', match.group())
+        # A span swallows shorter quotes nested inside it; keep the most severe level
+        risk_level = max(
+            (risk.risk_level for needle, risk in needles.items() if needle in matched),
+            key=lambda level: RISK_SEVERITY.get(level, 0)
+        )
+        color = RISK_COLORS.get(risk_level, RISK_COLORS["low"])
+        out.append(html.escape(text[i:match.start()]))
+        out.append(f'<mark style="background-color: {color}; padding: 2px 4px; border-radius: 3px;">')
+        out.append(html.escape(match.group()))
+        out.append('</mark>')
+        i = match.end()
+    out.append(html.escape(text[i:]))
+    
+    return ''.join(out)
+
+
+def risk_cards_html(risks: List["RiskItem"]) -> str:
+    """
+    Render all risk cards as one HTML blob.
+    
+    Args:
+        risks: List of identified risks
+        
+    Returns:
+        str: HTML for the risk cards, with model output escaped
+    """
+    parts = ['<div class="risk-container">']
+    for risk in risks:
+        risk_icon = RISK_ICONS.get(risk.risk_level, RISK_ICONS["medium"])
+        parts.append(
+            f'<div class="risk-{html.escape(risk.risk_level)}">'
+            f'<strong>{risk_icon} {html.escape(risk.risk_level.upper())} RISK</strong><br>'
+            f'<strong>Issue:</strong> {html.escape(risk.issue)}<br>'
+            f'<strong>Text:</strong> "{html.escape(risk.text[:200])}..."<br>'
+            f'<strong>Suggestion:</strong> {html.escape(risk.suggestion)}'
+            '</div>'
+        )
+    parts.append('</div>')
+    return ''.join(parts)
 
 
 def main():
@@ -145,71 +421,121 @@ def main():
         
         # Sample contract for testing
         st.header("🧪 Try with Sample Contract")
+        # Remember the choice so the page survives reruns (polling, downloads)
         if st.button("Load Sample NDA"):
-            sample_text = """
-            NON-DISCLOSURE AGREEMENT
-            
-            This Non-Disclosure Agreement is entered into between TechCorp Inc. and DataSolutions LLC.
-            
-            CONFIDENTIALITY
-            The Receiving Party agrees to hold and maintain the Confidential Information in strict confidence for a period of five years.
-            
-            TERMINATION
-            This Agreement may be terminated by either party with 30 days written notice.
-            
-            GOVERNING LAW
-            This Agreement shall be governed by and construed in accordance with the laws of the State of California.
-            
-            LIABILITY
-            In no event shall either party be liable for any indirect, special, or consequential damages exceeding $100,000.
-            """
-            
-            # Create a temporary file-like object for the sample
-            import io
-            sample_file = io.StringIO(sample_text)
-            sample_file.name = "sample_nda.txt"
-            
-            # Process the sample
-            process_contract(sample_file, sample_text)
+            st.session_state["sample_mode"] = "precomputed"
+        
+        # Debug: run the live pipeline on the sample instead of the precomputed result
+        if st.button("Re-analyze Sample NDA"):
+            st.session_state["sample_mode"] = "live"
+        
+        # Without a generated analysis asset the sample always runs live
+        sample_mode = st.session_state.get("sample_mode")
+        if sample_mode == "precomputed" and SAMPLE_ANALYSIS_PATH.exists():
+            sample = load_sample_analysis()
+            render_results("sample_nda.txt", sample["text"], sample["analysis_results"], sample["risks"])
+        elif sample_mode is not None:
+            process_contract("sample_nda.txt", load_sample_text())
         
         return
     
     # Process uploaded file
-    with st.spinner("📄 Extracting text from document..."):
+    data = uploaded_file.getvalue()
+    with st.status("📄 Extracting text from document...", expanded=True) as status:
         try:
-            text = extract_text(uploaded_file)
-            text = clean_text(text)
-            
-            if not text.strip():
-                st.error("❌ Could not extract text from the uploaded file. Please check the file format and try again.")
-                return
-                
+            text, meta = _cached_extract(content_hash(data), uploaded_file.name, data)
         except Exception as e:
+            status.update(label="❌ Text extraction failed", state="error")
             st.error(f"❌ Error extracting text: {str(e)}")
             return
+        
+        if not text.strip():
+            status.update(label="❌ Text extraction failed", state="error")
+            st.error("❌ Could not extract text from the uploaded file. Please check the file format and try again.")
+            return
+        
+        st.write(f"📄 Extracted {len(text):,} characters from {meta['filename']}")
+        analysis_results, risks = run_analysis(status, text)
     
-    process_contract(uploaded_file, text)
+    render_results(meta["filename"], text, analysis_results, risks)
 
 
-def process_contract(uploaded_file, text: str):
+def process_contract(filename: str, text: str):
     """Process the contract text and display analysis results."""
+    with st.status("🤖 Running analysis...", expanded=True) as status:
+        analysis_results, risks = run_analysis(status, text)
     
+    render_results(filename, text, analysis_results, risks)
+
+
+def run_analysis(status, text: str) -> Tuple[Dict, List["RiskItem"]]:
+    """
+    Run the LLM analysis pipeline, reporting each step on a st.status container.
+    
+    Every step is cached on the contract's content hash, so reruns skip
+    straight to rendering.
+    
+    Args:
+        status: The st.status container to report progress on
+        text: Contract text content
+        
+    Returns:
+        Tuple[Dict, List[RiskItem]]: Analysis results and identified risks
+    """
+    from exa_search import search_regulatory_hints
+    
+    h = text_hash(text)
+    
+    status.update(label="🤖 Classifying contract and extracting clauses...")
+    analysis_results = _cached_analyze(h, text, _on_progress=lambda message: status.update(label=message))
+    contract_type = analysis_results.get("contract_type", "Commercial")
+    country = analysis_results.get("governing_law", "Unknown")
+    st.write(f"🤖 {contract_type} contract governed by {country}, "
+             f"{len(analysis_results.get('key_clauses', {}))} key clauses found")
+    
+    status.update(label="🔗 Searching regulatory information...")
+    regulatory_hints = search_regulatory_hints(contract_type, country)
+    st.write(f"🔗 {len(regulatory_hints)} regulatory considerations found")
+    
+    status.update(label="🧠 Running AI risk review...")
+    cache_key = (h, contract_type, country, regulatory_hints)
+    risks = _poll_llm_review(h, contract_type, country, regulatory_hints, text)
+    if risks is None and st.session_state.get("llm_review_cancelled") == cache_key:
+        status.update(label="⏹️ Risk review cancelled", state="error")
+        if st.button("🔄 Restart risk review"):
+            del st.session_state["llm_review_cancelled"]
+            st.rerun()
+        st.stop()
+    if risks is None:
+        # Still running: show what has arrived so far and poll again shortly
+        partial = st.session_state["llm_review_job"]["risks"]
+        st.html(f"<strong>🧠 {len(partial)} risk(s) identified so far...</strong>" + risk_cards_html(partial))
+        if st.button("⏹️ Cancel"):
+            _cancel_llm_review()
+            st.rerun()
+        time.sleep(0.5)
+        st.rerun()
+    st.write(f"🧠 {len(risks)} risks identified")
+    
+    status.update(label="✅ Analysis complete", state="complete", expanded=False)
+    return analysis_results, risks
+
+
+def render_results(filename: str, text: str, analysis_results: Dict, risks: List["RiskItem"]):
+    """Display the analysis results and risk review for a contract."""
     # Show text preview
     with st.expander("📄 Document Preview", expanded=False):
         st.text_area("Extracted Text:", text[:2000] + "..." if len(text) > 2000 else text, height=200, disabled=True)
     
-    # Analyze contract using LLM
-    with st.spinner("🤖 Running comprehensive LLM-based contract analysis..."):
-        analysis_results = analyze_contract_full(text)
-        contract_type = analysis_results.get("contract_type", "Commercial")
-        country = analysis_results.get("governing_law", "Unknown")
-        key_clauses_info = analysis_results.get("key_clauses", {})
-        clause_risks = analysis_results.get("clause_risks", {})
-        
-        # Convert to format expected by UI
-        key_clauses = {}
-        for clause_type, clause_info in key_clauses_info.items():
-            key_clauses[clause_type] = [clause_info.text]
+    contract_type = analysis_results.get("contract_type", "Commercial")
+    country = analysis_results.get("governing_law", "Unknown")
+    key_clauses_info = analysis_results.get("key_clauses", {})
+    clause_risks = analysis_results.get("clause_risks", {})
+    
+    # Convert to format expected by UI
+    key_clauses = {}
+    for clause_type, clause_info in key_clauses_info.items():
+        key_clauses[clause_type] = [clause_info.text]
     
     # Display analysis results
     st.markdown(f"""
@@ -262,14 +588,6 @@ def process_contract(uploaded_file, text: str):
                 
                 st.divider()
     
-    # Perform AI review
-    with st.spinner("🧠 Running AI risk analysis and regulatory search..."):
-        # Get regulatory hints
-        regulatory_hints = search_regulatory_hints(contract_type, country)
-        
-        # Perform LLM review
-        risks = llm_review(text, contract_type, country, regulatory_hints)
-    
     # Create two columns for results
     col1, col2 = st.columns([1, 1])
     
@@ -277,7 +595,7 @@ def process_contract(uploaded_file, text: str):
         st.header("📋 Original Contract")
         if risks:
             highlighted_text = highlight_risks_in_text(text, risks)
-            st.markdown(highlighted_text, unsafe_allow_html=True)
+            st.html(f'<div class="contract-text">{highlighted_text}</div>')
         else:
             st.text_area("Contract Text:", text, height=600, disabled=True)
     
@@ -287,26 +605,10 @@ def process_contract(uploaded_file, text: str):
         if not risks:
             st.info("✅ No significant risks detected in this contract.")
         else:
-            # Group risks by level
-            risk_counts = {"high": 0, "medium": 0, "low": 0}
-            
-            for risk in risks:
-                risk_counts[risk.risk_level] += 1
-                
-                # Display risk with appropriate styling
-                risk_class = f"risk-{risk.risk_level}"
-                risk_icon = {"high": "🔴", "medium": "🟠", "low": "🟡"}[risk.risk_level]
-                
-                st.markdown(f"""
-                <div class="{risk_class}">
-                    <strong>{risk_icon} {risk.risk_level.upper()} RISK</strong><br>
-                    <strong>Issue:</strong> {risk.issue}<br>
-                    <strong>Text:</strong> "{risk.text[:200]}..."<br>
-                    <strong>Suggestion:</strong> {risk.suggestion}
-                </div>
-                """, unsafe_allow_html=True)
+            st.html(risk_cards_html(risks))
     
     # Risk summary metrics
+    risk_counts = Counter(risk.risk_level for risk in risks)
     if risks:
         st.header("📊 Risk Summary")
         col1, col2, col3, col4 = st.columns(4)
@@ -323,44 +625,31 @@ def process_contract(uploaded_file, text: str):
     # Download section
     st.header("💾 Download Results")
     
+    h = text_hash(text)
     col1, col2 = st.columns(2)
     
     with col1:
         # Prepare download data
-        download_data = {
-            "contract_analysis": {
-                "filename": uploaded_file.name,
-                "contract_type": contract_type,
-                "governing_law": country,
-                "key_clauses": list(key_clauses.keys()) if key_clauses else [],
-                "analysis_date": pd.Timestamp.now().isoformat()
-            },
-            "risks": [risk.dict() for risk in risks],
-            "summary": {
-                "total_risks": len(risks),
-                "high_risk_count": risk_counts.get("high", 0),
-                "medium_risk_count": risk_counts.get("medium", 0),
-                "low_risk_count": risk_counts.get("low", 0)
-            }
-        }
-        
-        json_str = json.dumps(download_data, indent=2)
+        json_str = _cached_report_json(
+            h, filename, contract_type, country,
+            tuple(key_clauses.keys()), tuple(risks)
+        )
         
         st.download_button(
             label="📥 Download Analysis (JSON)",
             data=json_str,
-            file_name=f"contract_review_{uploaded_file.name}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.json",
+            file_name=f"contract_review_{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             mime="application/json"
         )
     
     with col2:
         # Convert to markdown and offer download
-        markdown_content = convert_text_to_markdown(text, f"Contract Analysis: {uploaded_file.name}")
+        markdown_content = _cached_markdown(h, text, f"Contract Analysis: {filename}")
         
         st.download_button(
             label="📄 Download as Markdown",
             data=markdown_content,
-            file_name=f"contract_{uploaded_file.name}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.md",
+            file_name=f"contract_{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md",
             mime="text/markdown"
         )
 
@@ -0,0 +1,225 @@
+"""
+Offline bulk contract analysis through the OpenAI Batch API.
+
+Batch requests cost half as much as interactive calls and have their own,
+much higher rate limits, in exchange for results arriving within 24 hours.
+The interactive Streamlit flow keeps using llm_analyzer directly.
+"""
+
+import io
+import json
+import logging
+import time
+from typing import Dict, List, Type
+from pydantic import BaseModel
+from langchain_core.prompt_values import PromptValue
+from langchain_core.utils.function_calling import convert_to_openai_function
+from clients import get_openai_client
+from llm_analyzer import (
+    EXTRACTION_MODEL,
+    ClauseRiskBatch,
+    ContractOverview,
+    OVERVIEW_CHAT_PROMPT,
+    RISK_BATCH_CHAT_PROMPT,
+    low_risk_assessment,
+    merge_clauses,
+    normalize_contract_type,
+    normalize_governing_law,
+    risk_batches,
+    vote_contract_type,
+    vote_governing_law,
+    split_text_chunks
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds between batch status checks
+BATCH_POLL_INTERVAL = 60
+
+# Batch statuses after which no more results will arrive
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# LangChain message types and the chat completions roles they map to
+_MESSAGE_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+def _chat_request(custom_id: str, prompt: PromptValue, schema: Type[BaseModel], model_name: str) -> Dict:
+    """
+    Build one Batch API request line for a chat completion with a JSON schema response.
+    
+    Uses the same strict JSON schema mode as the interactive structured
+    output models, so batch responses parse the same way.
+    """
+    function = convert_to_openai_function(schema, strict=True)
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model_name,
+            "temperature": 0,
+            "messages": [
+                {"role": _MESSAGE_ROLES[message.type], "content": message.content}
+                for message in prompt.to_messages()
+            ],
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": function["name"],
+                    "description": function["description"],
+                    "schema": function["parameters"],
+                    "strict": True
+                }
+            }
+        }
+    }
+
+
+def _run_batch(requests: List[Dict], poll_interval: float) -> Dict[str, str]:
+    """
+    Submit requests as one batch and wait for it to finish.
+
+    Args:
+        requests: Batch API request lines
+        poll_interval: Seconds between status checks
+
+    Returns:
+        Dict[str, str]: Response message content keyed by custom_id; failed
+            requests are omitted
+    """
+    if not requests:
+        return {}
+
+    client = get_openai_client()
+    jsonl = "\n".join(json.dumps(request) for request in requests)
+    batch_file = client.files.create(
+        file=("contracts.jsonl", io.BytesIO(jsonl.encode("utf-8"))),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    logger.info("Submitted batch %s with %d requests", batch.id, len(requests))
+
+    while batch.status not in _TERMINAL_STATUSES:
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+    logger.info("Batch %s finished with status %s", batch.id, batch.status)
+
+    # Expired and cancelled batches still return the requests that completed
+    if not batch.output_file_id:
+        return {}
+
+    results = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        response = result.get("response") or {}
+        if response.get("status_code") != 200:
+            logger.warning("Batch request %s failed: %s", result["custom_id"], result.get("error"))
+            continue
+        results[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+    return results
+
+
+def analyze_contracts_batch(texts: List[str], poll_interval: float = BATCH_POLL_INTERVAL) -> List[Dict]:
+    """
+    Analyze many contracts through the Batch API.
+
+    Runs two batches: one overview request per contract chunk (type,
+    governing law and key clauses), then the clause risk assessments, which
+    depend on the overview results. Blocks until both batches finish, which
+    can take hours.
+
+    Args:
+        texts: Contract text contents
+        poll_interval: Seconds between batch status checks
+
+    Returns:
+        List[Dict]: One analysis per contract, in input order, in the same
+            shape as analyze_contract_comprehensive
+    """
+    # Batch 1: contract overviews, one request per chunk
+    chunked_texts = [split_text_chunks(text) for text in texts]
+    overview_requests = [
+        _chat_request(
+            f"{doc_id}:overview:{chunk_id}",
+            OVERVIEW_CHAT_PROMPT.format_prompt(text=chunk),
+            ContractOverview,
+            EXTRACTION_MODEL
+        )
+        for doc_id, chunks in enumerate(chunked_texts)
+        for chunk_id, chunk in enumerate(chunks)
+    ]
+    overview_results = _run_batch(overview_requests, poll_interval)
+
+    analyses = []
+    for doc_id, chunks in enumerate(chunked_texts):
+        overviews = []
+        for chunk_id in range(len(chunks)):
+            content = overview_results.get(f"{doc_id}:overview:{chunk_id}")
+            if content is None:
+                continue
+            try:
+                overviews.append(ContractOverview.model_validate_json(content))
+            except ValueError:
+                logger.exception("Error parsing overview for contract %d, chunk %d", doc_id, chunk_id)
+        analyses.append({
+            "contract_type": vote_contract_type(
+                [normalize_contract_type(overview.contract_type) for overview in overviews]
+            ),
+            "governing_law": vote_governing_law(
+                [normalize_governing_law(overview.governing_law) for overview in overviews]
+            ),
+            "key_clauses": merge_clauses([
+                {
+                    clause.clause_type: clause.clause_info()
+                    for clause in overview.key_clauses
+                }
+                for overview in overviews
+            ]),
+            "clause_risks": {}
+        })
+
+    # Batch 2: risk assessments for substantial clauses, a few clauses per
+    # request, with long clauses sent to the stronger model; clauses already
+    # rated low risk need no request
+    risk_requests = []
+    for doc_id, analysis in enumerate(analyses):
+        substantial_clauses = []
+        for clause_type, clause_info in analysis["key_clauses"].items():
+            if len(clause_info.text) <= 100:
+                continue
+            if clause_info.preliminary_risk == "low":
+                analysis["clause_risks"][clause_type] = low_risk_assessment()
+            else:
+                substantial_clauses.append((clause_type, clause_info.text))
+        for i, (model_name, clauses) in enumerate(risk_batches(substantial_clauses)):
+            clauses_text = "\n\n".join(
+                f"### {clause_type}\n{clause_text}" for clause_type, clause_text in clauses.items()
+            )
+            prompt = RISK_BATCH_CHAT_PROMPT.format_prompt(
+                clauses=clauses_text,
+                contract_type=analysis["contract_type"],
+                governing_law=analysis["governing_law"]
+            )
+            risk_requests.append(_chat_request(f"{doc_id}:risk:{i}", prompt, ClauseRiskBatch, model_name))
+    risk_results = _run_batch(risk_requests, poll_interval)
+
+    # Join results back to their contracts by custom_id
+    for custom_id, content in risk_results.items():
+        doc_id = int(custom_id.split(":")[0])
+        analysis = analyses[doc_id]
+        try:
+            batch = ClauseRiskBatch.model_validate_json(content)
+        except ValueError:
+            logger.exception("Error parsing risk assessment %s", custom_id)
+            continue
+        for result in batch.results:
+            if result.clause_type in analysis["key_clauses"]:
+                analysis["clause_risks"][result.clause_type] = result
+
+    return analyses
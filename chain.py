@@ -2,38 +2,84 @@
 LangChain integration for AI-powered contract review.
 """
 
-import os
-from typing import List
-from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
+import asyncio
+import logging
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterator, List, Sequence
+from pydantic import BaseModel, ConfigDict, Field
 from langchain.prompts import ChatPromptTemplate
-from dotenv import load_dotenv
+from clients import MAX_CONCURRENT_LLM_CALLS, bounded, get_chat_model, run_async
+from prompts.contract_analysis import CONTRACT_REFERENCE
+from tokens import token_windows
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# Initialize OpenAI model
-model = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0,
-    api_key=os.getenv("OPENAI_API_KEY")
-)
 
 class RiskItem(BaseModel):
     """Represents a risk identified in a contract."""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+    
     text: str = Field(description="The problematic text from the contract")
     issue: str = Field(description="Description of the issue")
     suggestion: str = Field(description="Suggested improvement")
     risk_level: str = Field(description="Risk level: high, medium, or low")
 
-RISK_ANALYSIS_PROMPT = """You are an expert contract attorney. Analyze the following contract text and identify potential risks and issues.
 
-Contract Type: {contract_type}
-Governing Law: {country}
-Regulatory Hints: {regulatory_hints}
+class RiskList(BaseModel):
+    """Risks identified in a contract, as returned by the model."""
+    risks: List[RiskItem] = Field(description="Identified risks, empty if none are significant")
 
-Contract Text:
-{text}
+
+class ContractAnalysisSummary(BaseModel):
+    """Contract-level findings included in a downloadable report."""
+    filename: str
+    contract_type: str
+    governing_law: str
+    key_clauses: List[str]
+    analysis_date: datetime
+
+
+class RiskSummary(BaseModel):
+    """Risk counts by level included in a downloadable report."""
+    total_risks: int
+    high_risk_count: int
+    medium_risk_count: int
+    low_risk_count: int
+    
+    @classmethod
+    def from_risks(cls, risks: List[RiskItem]) -> "RiskSummary":
+        """Count risks by level."""
+        levels = [risk.risk_level for risk in risks]
+        return cls(
+            total_risks=len(risks),
+            high_risk_count=levels.count("high"),
+            medium_risk_count=levels.count("medium"),
+            low_risk_count=levels.count("low")
+        )
+
+
+class AnalysisReport(BaseModel):
+    """Complete contract review, serialized for the JSON download."""
+    contract_analysis: ContractAnalysisSummary
+    risks: List[RiskItem]
+    summary: RiskSummary
+
+
+# Terms that any contract worth a risk review mentions at least once
+_RISK_KEYWORDS = re.compile(
+    r'\b(liabilit|indemnif|terminat|confidential|govern|damag|warrant|non.?compet|breach|penalt)',
+    re.IGNORECASE
+)
+
+# Contracts longer than one window are reviewed in overlapping token windows
+REVIEW_WINDOW_TOKENS = 6000
+REVIEW_WINDOW_OVERLAP = 500
+
+RISK_ANALYSIS_PROMPT = CONTRACT_REFERENCE + """TASK
+
+You are an expert contract attorney. Analyze the contract text provided by the user and identify potential risks and issues.
 
 Please identify specific risks in the contract. For each risk, provide:
 1. The exact problematic text from the contract
@@ -49,12 +95,71 @@ Focus on:
 - Industry best practices
 
 Return your analysis as a structured list of risks. If no significant risks are found, return an empty list.
+"""
+
+RISK_ANALYSIS_USER_PROMPT = """Contract Type: {contract_type}
+Governing Law: {country}
+Regulatory Hints: {regulatory_hints}
 
-Example format:
-Risk 1: [problematic text] - Issue: [description] - Suggestion: [improvement] - Level: [high/medium/low]
+Contract Text:
+{text}
 """
 
-def llm_review(text: str, contract_type: str, country: str, regulatory_hints: List[str]) -> List[RiskItem]:
+# Static instructions first so OpenAI's prompt cache can reuse them across contracts
+PROMPT = ChatPromptTemplate.from_messages([("system", RISK_ANALYSIS_PROMPT), ("user", RISK_ANALYSIS_USER_PROMPT)])
+
+
+@lru_cache(maxsize=None)
+def _review_model():
+    """
+    Shared chat model bound to the RiskList schema so responses arrive validated.
+    
+    Bound through function calling because its tool parser streams a growing
+    partial RiskList; the json_schema method only parses the finished response.
+    """
+    return get_chat_model().with_structured_output(RiskList, method="function_calling", strict=True)
+
+
+def _review_prompt(contract_type: str, country: str, regulatory_hints: Sequence[str]) -> ChatPromptTemplate:
+    """Bind the per-contract slots of the risk analysis prompt, leaving only {text}."""
+    # Format regulatory hints
+    hints_text = "\n".join(f"- {hint}" for hint in regulatory_hints)
+    
+    return PROMPT.partial(
+        contract_type=contract_type,
+        country=country,
+        regulatory_hints=hints_text
+    )
+
+
+def analysis_error_risk() -> RiskItem:
+    """Placeholder risk returned when the LLM review fails."""
+    return RiskItem(
+        text="Contract analysis error",
+        issue="Unable to complete automated analysis",
+        suggestion="Please review this contract manually with legal counsel",
+        risk_level="medium"
+    )
+
+
+def _nothing_to_review(text: str) -> bool:
+    """Cheap pre-check for text with none of the terms a risk review looks at."""
+    return not _RISK_KEYWORDS.search(text)
+
+
+def _merge_risks(risk_lists: List[List[RiskItem]]) -> List[RiskItem]:
+    """Merge risks from overlapping windows, dropping repeats of the same text."""
+    seen = set()
+    merged = []
+    for risks in risk_lists:
+        for risk in risks:
+            if risk.text not in seen:
+                seen.add(risk.text)
+                merged.append(risk)
+    return merged
+
+
+def llm_review(text: str, contract_type: str, country: str, regulatory_hints: Sequence[str], fast_path: bool = True) -> List[RiskItem]:
     """
     Perform LLM-based contract review to identify risks.
     
@@ -63,93 +168,86 @@ def llm_review(text: str, contract_type: str, country: str, regulatory_hints: Li
         contract_type: Type of contract
         country: Governing law country
         regulatory_hints: List of regulatory considerations
+        fast_path: Skip the model call for text with no risk-related terms
         
     Returns:
         List[RiskItem]: List of identified risks
     """
-    try:
-        # Limit text length to avoid token limits
-        text_sample = text[:8000] if len(text) > 8000 else text
-        
-        # Format regulatory hints
-        hints_text = "\n".join(f"- {hint}" for hint in regulatory_hints)
+    return run_async(allm_review(text, contract_type, country, regulatory_hints, fast_path=fast_path))
+
+
+async def allm_review(text: str, contract_type: str, country: str, regulatory_hints: Sequence[str], fast_path: bool = True) -> List[RiskItem]:
+    """
+    Perform LLM-based contract review without blocking the event loop.
+    
+    Args:
+        text: Contract text content
+        contract_type: Type of contract
+        country: Governing law country
+        regulatory_hints: List of regulatory considerations
+        fast_path: Skip the model call for text with no risk-related terms
         
-        prompt = ChatPromptTemplate.from_template(RISK_ANALYSIS_PROMPT)
-        response = model.invoke(prompt.format(
-            text=text_sample,
-            contract_type=contract_type,
-            country=country,
-            regulatory_hints=hints_text
+    Returns:
+        List[RiskItem]: List of identified risks
+    """
+    if fast_path and _nothing_to_review(text):
+        return []
+    
+    try:
+        prompt = _review_prompt(contract_type, country, regulatory_hints)
+        windows = token_windows(text, REVIEW_WINDOW_TOKENS, REVIEW_WINDOW_OVERLAP)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+        results = await asyncio.gather(*(
+            bounded(semaphore, _review_model().ainvoke(prompt.format_prompt(text=window)))
+            for window in windows
         ))
+        return _merge_risks([result.risks for result in results])
         
-        # Parse the response to extract risks
-        risks = []
-        response_text = response.content.strip()
-        
-        if not response_text or "no significant risks" in response_text.lower():
-            return risks
-        
-        # Simple parsing of the response
-        lines = response_text.split('\n')
-        current_risk = {}
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            if line.startswith('Risk') and ':' in line:
-                # New risk found, save previous if exists
-                if current_risk:
-                    risks.append(create_risk_item(current_risk))
-                    current_risk = {}
-                
-                # Parse the risk line
-                parts = line.split(' - ')
-                if len(parts) >= 4:
-                    text_part = parts[0].split(': ', 1)[1] if ': ' in parts[0] else ""
-                    issue_part = parts[1].replace('Issue: ', '') if parts[1].startswith('Issue: ') else parts[1]
-                    suggestion_part = parts[2].replace('Suggestion: ', '') if parts[2].startswith('Suggestion: ') else parts[2]
-                    level_part = parts[3].replace('Level: ', '') if parts[3].startswith('Level: ') else parts[3]
-                    
-                    current_risk = {
-                        'text': text_part.strip(),
-                        'issue': issue_part.strip(),
-                        'suggestion': suggestion_part.strip(),
-                        'risk_level': level_part.strip().lower()
-                    }
-        
-        # Add the last risk if exists
-        if current_risk:
-            risks.append(create_risk_item(current_risk))
-        
-        # If parsing failed, create a general risk
-        if not risks and response_text:
-            risks.append(RiskItem(
-                text="General contract review",
-                issue="Contract requires detailed legal review",
-                suggestion="Have this contract reviewed by qualified legal counsel",
-                risk_level="medium"
-            ))
-        
-        return risks
+    except Exception:
+        logger.exception("Error in LLM review")
+        return [analysis_error_risk()]
+
+
+def stream_llm_review(text: str, contract_type: str, country: str, regulatory_hints: Sequence[str], fast_path: bool = True) -> Iterator[RiskItem]:
+    """
+    Perform LLM-based contract review, yielding risks as the model emits them.
+    
+    Args:
+        text: Contract text content
+        contract_type: Type of contract
+        country: Governing law country
+        regulatory_hints: List of regulatory considerations
+        fast_path: Skip the model call for text with no risk-related terms
         
-    except Exception as e:
-        print(f"Error in LLM review: {e}")
-        return [
-            RiskItem(
-                text="Contract analysis error",
-                issue="Unable to complete automated analysis",
-                suggestion="Please review this contract manually with legal counsel",
-                risk_level="medium"
-            )
-        ]
-
-def create_risk_item(risk_data: dict) -> RiskItem:
-    """Create a RiskItem from parsed data."""
-    return RiskItem(
-        text=risk_data.get('text', 'Unknown text'),
-        issue=risk_data.get('issue', 'Issue identified'),
-        suggestion=risk_data.get('suggestion', 'Review with legal counsel'),
-        risk_level=risk_data.get('risk_level', 'medium')
-    )
+    Yields:
+        RiskItem: Each identified risk as soon as it is complete
+    """
+    if fast_path and _nothing_to_review(text):
+        return
+    
+    seen = set()
+    try:
+        prompt = _review_prompt(contract_type, country, regulatory_hints)
+        for window in token_windows(text, REVIEW_WINDOW_TOKENS, REVIEW_WINDOW_OVERLAP):
+            emitted = 0
+            result = None
+            for result in _review_model().stream(prompt.format_prompt(text=window)):
+                # Every risk but the last is complete once a later one has started
+                completed = result.risks[:-1]
+                while emitted < len(completed):
+                    risk = completed[emitted]
+                    emitted += 1
+                    if risk.text not in seen:
+                        seen.add(risk.text)
+                        yield risk
+            
+            # Flush the remaining risks from the final, fully parsed response
+            if result is not None:
+                for risk in result.risks[emitted:]:
+                    if risk.text not in seen:
+                        seen.add(risk.text)
+                        yield risk
+            
+    except Exception:
+        logger.exception("Error in LLM review")
+        yield analysis_error_risk()
@@ -0,0 +1,160 @@
+"""
+Shared OpenAI chat model and API clients.
+"""
+
+import asyncio
+import os
+import threading
+from functools import lru_cache
+from typing import Awaitable, Optional, TypeVar
+import httpx
+from langchain_openai import ChatOpenAI
+from openai import OpenAI
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Keep-alive pool shared by every OpenAI call in the process
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+HTTP_TIMEOUT = 60
+
+# Upper bound on LLM requests in flight for one analysis or review (OpenAI rate limits)
+MAX_CONCURRENT_LLM_CALLS = 8
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def get_http_client() -> httpx.Client:
+    """Return the process-wide HTTP/2 client for synchronous OpenAI calls."""
+    return httpx.Client(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport keeping a separate connection pool for each event loop.
+    
+    Pooled async connections belong to the loop that opened them, and every
+    analysis runs on its own loop via run_async, from Streamlit script
+    threads and worker threads alike. Connections are therefore reused
+    within one analysis, not across analyses. run_async closes a loop's pool
+    before the loop closes; pools of loops closed some other way cannot be
+    closed any more and are only dropped.
+    """
+    
+    def __init__(self):
+        self._transports = {}
+        self._lock = threading.Lock()
+    
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for closed in [other for other in self._transports if other.is_closed()]:
+                del self._transports[closed]
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(http2=True, limits=HTTP_LIMITS)
+                self._transports[loop] = transport
+            return transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+    
+    async def aclose(self) -> None:
+        """Close the running loop's connection pool; other loops' pools stay open."""
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+@lru_cache(maxsize=None)
+def _async_transport() -> _PerLoopTransport:
+    """Return the process-wide per-loop transport behind the async client."""
+    return _PerLoopTransport()
+
+
+@lru_cache(maxsize=None)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP/2 client for asynchronous OpenAI calls, pooled per event loop."""
+    return httpx.AsyncClient(transport=_async_transport(), timeout=HTTP_TIMEOUT)
+
+
+async def bounded(semaphore: Optional[asyncio.Semaphore], coro: Awaitable[T]) -> T:
+    """Await coro while holding a slot of semaphore, or unbounded if semaphore is None."""
+    if semaphore is None:
+        return await coro
+    async with semaphore:
+        return await coro
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """
+    Run coro to completion on a new event loop, like asyncio.run.
+    
+    The loop's OpenAI connection pool is closed before the loop is, so its
+    sockets are released rather than left for the garbage collector.
+    
+    Args:
+        coro: Coroutine to run
+    
+    Returns:
+        The coroutine's result
+    """
+    async def main():
+        try:
+            return await coro
+        finally:
+            await _async_transport().aclose()
+    
+    return asyncio.run(main())
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model_name: str = DEFAULT_MODEL) -> ChatOpenAI:
+    """
+    Return the process-wide chat model for model_name, creating it on first use.
+    
+    The model uses the shared HTTP/2 connection pools. Synchronous calls from
+    every caller (and every Streamlit session in the process) reuse warm
+    keep-alive connections; asynchronous calls reuse them within one
+    analysis, i.e. one run_async event loop, instead of paying a TLS
+    handshake per request.
+    
+    Args:
+        model_name: OpenAI model name
+    
+    Returns:
+        ChatOpenAI: Shared chat model
+    """
+    return ChatOpenAI(
+        model=model_name,
+        temperature=0,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        max_retries=4,
+        timeout=HTTP_TIMEOUT,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client()
+    )
+
+
+@lru_cache(maxsize=None)
+def get_openai_client() -> OpenAI:
+    """
+    Return the process-wide OpenAI API client, creating it on first use.
+    
+    Used for endpoints LangChain does not wrap, such as file uploads and
+    the Batch API.
+    
+    Returns:
+        OpenAI: Shared API client
+    """
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        max_retries=4,
+        timeout=HTTP_TIMEOUT,
+        http_client=get_http_client()
+    )
@@ -2,35 +2,76 @@
 LLM-based contract analysis using OpenAI and LangChain.
 """
 
-import os
-import json
-from typing import Dict, List, Optional
-from langchain_openai import ChatOpenAI
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, List, Literal, Optional, Tuple, Type
 from langchain.prompts import ChatPromptTemplate
+from langchain_core.prompt_values import PromptValue
+from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pydantic import BaseModel, Field
-from dotenv import load_dotenv
+from clients import DEFAULT_MODEL, MAX_CONCURRENT_LLM_CALLS, bounded, get_chat_model
+from llm_cache import get_llm_cache
+from tokens import count_tokens
 from prompts.contract_analysis import (
     CONTRACT_TYPE_DETECTION_PROMPT,
     GOVERNING_LAW_DETECTION_PROMPT,
     KEY_CLAUSES_EXTRACTION_PROMPT,
-    CLAUSE_RISK_ASSESSMENT_PROMPT
+    CLAUSE_RISK_ASSESSMENT_PROMPT,
+    CLAUSE_RISK_ASSESSMENT_USER_PROMPT,
+    CLAUSE_RISK_BATCH_ASSESSMENT_PROMPT,
+    CLAUSE_RISK_BATCH_ASSESSMENT_USER_PROMPT,
+    CONTRACT_OVERVIEW_PROMPT,
+    CONTRACT_TEXT_USER_PROMPT
 )
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# Initialize OpenAI model
-model = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0,
-    api_key=os.getenv("OPENAI_API_KEY")
+# Clauses assessed per batched risk call; larger sets are split and run concurrently
+CLAUSE_RISK_BATCH_SIZE = 5
+
+# Long contracts are analyzed chunk by chunk and the per-chunk answers combined.
+# Chunks are sized in tokens so every call has the same, predictable budget
+# however dense the text is.
+CHUNK_TOKENS = 1000
+CHUNK_OVERLAP_TOKENS = 50
+
+text_splitter = RecursiveCharacterTextSplitter(
+    chunk_size=CHUNK_TOKENS,
+    chunk_overlap=CHUNK_OVERLAP_TOKENS,
+    length_function=count_tokens,
+    separators=["\n\n", "\n", ". ", " ", ""]
 )
 
+# Model tiers: a cheap model for classification, the default model for
+# extraction, and a stronger model for assessing long clauses
+FAST_MODEL = "gpt-4.1-nano"
+EXTRACTION_MODEL = DEFAULT_MODEL
+STRONG_MODEL = "gpt-4o"
+
+# Clauses longer than this are risk-assessed with STRONG_MODEL
+LONG_CLAUSE_CHARS = 1500
+
+# Type and governing-law answers remembered in-process, keyed by a hash of
+# the task, model and text, so repeat detections of a contract skip the
+# tokenizing, chunking and disk cache reads. Shared by the Streamlit script
+# threads and the worker pool, hence the lock.
+DETECTION_MEMO_SIZE = 256
+_detection_memo: "OrderedDict[bytes, str]" = OrderedDict()
+_detection_memo_lock = threading.Lock()
+
 
 class ClauseInfo(BaseModel):
     """Information about a contract clause."""
     text: str = Field(description="Exact text of the clause")
     summary: str = Field(description="Brief summary of the clause")
+    preliminary_risk: Optional[Literal["high", "medium", "low"]] = Field(
+        default=None,
+        description="Coarse risk level given during extraction, if any"
+    )
 
 
 class ClauseRiskAssessment(BaseModel):
@@ -41,110 +82,281 @@ class ClauseRiskAssessment(BaseModel):
     explanation: str = Field(description="Detailed explanation of the assessment")
 
 
-def detect_contract_type_llm(text: str) -> str:
+class ClauseRisk(ClauseRiskAssessment):
+    """Risk assessment for one clause of a batched assessment."""
+    clause_type: str = Field(description="Clause type, exactly as given in the input")
+
+
+class ClauseRiskBatch(BaseModel):
+    """Risk assessments for several clauses returned from a single call."""
+    results: List[ClauseRisk] = Field(description="One assessment per clause")
+
+
+class ExtractedClause(ClauseInfo):
+    """A key clause as returned by the extraction and overview prompts."""
+    clause_type: str = Field(description="Clause type, e.g. termination, liability, confidentiality")
+    preliminary_risk: Literal["high", "medium", "low"] = Field(description="Coarse risk level: high, medium, or low")
+    
+    def clause_info(self) -> ClauseInfo:
+        """The clause without its type, for dictionaries keyed by clause type."""
+        return ClauseInfo(text=self.text, summary=self.summary, preliminary_risk=self.preliminary_risk)
+
+
+class KeyClauses(BaseModel):
+    """Key clauses extracted from a contract."""
+    clauses: List[ExtractedClause] = Field(description="Key clauses found in the contract")
+
+
+class ContractOverview(BaseModel):
+    """Contract type, governing law and key clauses from a single LLM call."""
+    contract_type: str = Field(description="One of: NDA, DPA, Employment, MSA, SLA, License, Purchase, Lease, Commercial")
+    governing_law: str = Field(description="Governing law country or jurisdiction, or Unknown")
+    key_clauses: List[ExtractedClause] = Field(description="Key clauses found in the contract")
+
+
+VALID_CONTRACT_TYPES = ["NDA", "DPA", "Employment", "MSA", "SLA", "License", "Purchase", "Lease", "Commercial"]
+
+
+@lru_cache(maxsize=None)
+def _structured_model(model_name: str, schema: Type[BaseModel]):
+    """
+    Chat model bound to schema, built once per model and schema.
+    
+    Strict JSON schema mode guarantees responses that parse, so there is no
+    text parsing to fail.
+    """
+    return get_chat_model(model_name).with_structured_output(schema, method="json_schema", strict=True)
+
+
+def low_risk_assessment() -> ClauseRiskAssessment:
+    """Assessment recorded for clauses rated low risk during extraction."""
+    return ClauseRiskAssessment(
+        risk_level="low",
+        issues=[],
+        recommendations=[],
+        explanation="Rated low risk during clause extraction; no detailed assessment was needed"
+    )
+
+
+def risk_model_name(clause_text: str) -> str:
+    """Model for assessing a clause: long clauses get the stronger model."""
+    return STRONG_MODEL if len(clause_text) > LONG_CLAUSE_CHARS else EXTRACTION_MODEL
+
+
+def risk_batches(clauses: List[Tuple[str, str]]) -> List[Tuple[str, Dict[str, str]]]:
+    """
+    Group (clause type, clause text) pairs into risk assessment calls of up to
+    CLAUSE_RISK_BATCH_SIZE clauses, each with the model to send it to.
+    
+    Long clauses are batched separately so only they go to the stronger model.
+    """
+    batches = []
+    for model_name in (EXTRACTION_MODEL, STRONG_MODEL):
+        tier = [clause for clause in clauses if risk_model_name(clause[1]) == model_name]
+        batches.extend(
+            (model_name, dict(tier[i:i + CLAUSE_RISK_BATCH_SIZE]))
+            for i in range(0, len(tier), CLAUSE_RISK_BATCH_SIZE)
+        )
+    return batches
+
+
+def normalize_contract_type(contract_type: str) -> str:
+    """Map a model answer onto a known contract type, defaulting to Commercial."""
+    contract_type = contract_type.strip()
+    return contract_type if contract_type in VALID_CONTRACT_TYPES else "Commercial"
+
+
+def normalize_governing_law(governing_law: str) -> str:
+    """Collapse the model's ways of saying 'none' into "Unknown"."""
+    governing_law = governing_law.strip()
+    if governing_law.lower() in ["unknown", "not specified", "not mentioned", "none", ""]:
+        return "Unknown"
+    return governing_law
+
+
+def split_text_chunks(text: str) -> List[str]:
+    """Split contract text into overlapping chunks; short texts stay whole."""
+    return text_splitter.split_text(text) or [text]
+
+
+def _head_and_tail(chunks: List[str]) -> List[str]:
+    """First and last chunk: parties and recitals open a contract, governing law closes it."""
+    return chunks if len(chunks) <= 2 else [chunks[0], chunks[-1]]
+
+
+def vote_contract_type(votes: List[str]) -> str:
+    """Majority contract type across chunks; ties go to the earliest chunk."""
+    return Counter(votes).most_common(1)[0][0] if votes else "Commercial"
+
+
+def vote_governing_law(votes: List[str]) -> str:
+    """Majority governing law across the chunks that mention one."""
+    known = [vote for vote in votes if vote != "Unknown"]
+    return Counter(known).most_common(1)[0][0] if known else "Unknown"
+
+
+def merge_clauses(clause_maps: List[Dict[str, ClauseInfo]]) -> Dict[str, ClauseInfo]:
+    """Merge per-chunk clauses; the first chunk with a clause type wins."""
+    merged = {}
+    for clauses in clause_maps:
+        for clause_type, clause_info in clauses.items():
+            if clause_type not in merged and clause_info.text:
+                merged[clause_type] = clause_info
+    return merged
+
+
+def _memo_key(task: str, model_name: str, text: str) -> bytes:
+    """Fixed-size key for a detection result, so the memo never holds contract text."""
+    return hashlib.sha256(f"{task}\0{model_name}\0{text}".encode("utf-8")).digest()
+
+
+def _memo_get(key: bytes) -> Optional[str]:
+    """Return a remembered detection result, marking it recently used."""
+    with _detection_memo_lock:
+        if key in _detection_memo:
+            _detection_memo.move_to_end(key)
+            return _detection_memo[key]
+        return None
+
+
+def _memo_put(key: bytes, value: str) -> None:
+    """Remember a detection result, evicting the least recently used."""
+    with _detection_memo_lock:
+        _detection_memo[key] = value
+        while len(_detection_memo) > DETECTION_MEMO_SIZE:
+            _detection_memo.popitem(last=False)
+
+
+def chat_prompt(system_prompt: str, user_prompt: str = CONTRACT_TEXT_USER_PROMPT) -> ChatPromptTemplate:
+    """Static system prompt followed by the per-contract user prompt, so the cacheable prefix comes first."""
+    return ChatPromptTemplate.from_messages([("system", system_prompt), ("user", user_prompt)])
+
+
+# Prompt templates, parsed once at import; the public ones are shared with batch_analyzer
+_TYPE_PROMPT = chat_prompt(CONTRACT_TYPE_DETECTION_PROMPT)
+_LAW_PROMPT = chat_prompt(GOVERNING_LAW_DETECTION_PROMPT)
+_CLAUSES_PROMPT = chat_prompt(KEY_CLAUSES_EXTRACTION_PROMPT)
+_RISK_PROMPT = chat_prompt(CLAUSE_RISK_ASSESSMENT_PROMPT, CLAUSE_RISK_ASSESSMENT_USER_PROMPT)
+RISK_BATCH_CHAT_PROMPT = chat_prompt(CLAUSE_RISK_BATCH_ASSESSMENT_PROMPT, CLAUSE_RISK_BATCH_ASSESSMENT_USER_PROMPT)
+OVERVIEW_CHAT_PROMPT = chat_prompt(CONTRACT_OVERVIEW_PROMPT)
+
+
+async def _cached_ainvoke(prompt: PromptValue, model_name: str, schema: Optional[Type[BaseModel]] = None):
+    """Invoke model_name, bound to schema if given, reusing a stored response for a prompt seen before."""
+    chat_model = get_chat_model(model_name)
+    runnable = chat_model if schema is None else _structured_model(model_name, schema)
+    return await get_llm_cache().ainvoke(runnable, prompt, model_name, schema, chat_model.temperature or 0)
+
+
+async def _detect_contract_type_chunk(chunk: str, model_name: str) -> str:
+    """Detect contract type from one chunk of the contract."""
+    response = await _cached_ainvoke(_TYPE_PROMPT.format_prompt(text=chunk), model_name)
+    
+    # Validate response
+    return normalize_contract_type(response.content)
+
+
+async def detect_contract_type_llm(text: str, model_name: str = FAST_MODEL, semaphore: Optional[asyncio.Semaphore] = None) -> str:
     """
     Detect contract type using LLM.
     
     Args:
         text: Contract text content
+        model_name: OpenAI model to use
+        semaphore: Limits concurrent requests when called as part of a
+            larger analysis
         
     Returns:
         str: Detected contract type
     """
+    key = _memo_key("contract_type", model_name, text)
+    if (contract_type := _memo_get(key)) is not None:
+        return contract_type
+    
     try:
-        # Limit text length to avoid token limits
-        text_sample = text[:4000] if len(text) > 4000 else text
-        
-        prompt = ChatPromptTemplate.from_template(CONTRACT_TYPE_DETECTION_PROMPT)
-        response = model.invoke(prompt.format(text=text_sample))
-        
-        contract_type = response.content.strip()
-        
-        # Validate response
-        valid_types = ["NDA", "DPA", "Employment", "MSA", "SLA", "License", "Purchase", "Lease", "Commercial"]
-        if contract_type in valid_types:
-            return contract_type
-        else:
-            return "Commercial"  # Default fallback
+        chunks = _head_and_tail(split_text_chunks(text))
+        votes = await asyncio.gather(*(bounded(semaphore, _detect_contract_type_chunk(chunk, model_name)) for chunk in chunks))
+        contract_type = vote_contract_type(votes)
+        _memo_put(key, contract_type)
+        return contract_type
             
-    except Exception as e:
-        print(f"Error in contract type detection: {e}")
+    except Exception:
+        logger.exception("Error in contract type detection")
         return "Commercial"
 
 
-def detect_governing_law_llm(text: str) -> str:
+async def _detect_governing_law_chunk(chunk: str, model_name: str) -> str:
+    """Detect governing law from one chunk of the contract."""
+    response = await _cached_ainvoke(_LAW_PROMPT.format_prompt(text=chunk), model_name)
+    
+    # Clean up common variations
+    return normalize_governing_law(response.content)
+
+
+async def detect_governing_law_llm(text: str, model_name: str = FAST_MODEL, semaphore: Optional[asyncio.Semaphore] = None) -> str:
     """
     Detect governing law using LLM.
     
     Args:
         text: Contract text content
+        model_name: OpenAI model to use
+        semaphore: Limits concurrent requests when called as part of a
+            larger analysis
         
     Returns:
         str: Detected governing law or "Unknown"
     """
+    key = _memo_key("governing_law", model_name, text)
+    if (governing_law := _memo_get(key)) is not None:
+        return governing_law
+    
     try:
-        # Limit text length to avoid token limits
-        text_sample = text[:4000] if len(text) > 4000 else text
-        
-        prompt = ChatPromptTemplate.from_template(GOVERNING_LAW_DETECTION_PROMPT)
-        response = model.invoke(prompt.format(text=text_sample))
-        
-        governing_law = response.content.strip()
-        
-        # Clean up common variations
-        if governing_law.lower() in ["unknown", "not specified", "not mentioned", "none"]:
-            return "Unknown"
-        
+        chunks = _head_and_tail(split_text_chunks(text))
+        votes = await asyncio.gather(*(bounded(semaphore, _detect_governing_law_chunk(chunk, model_name)) for chunk in chunks))
+        governing_law = vote_governing_law(votes)
+        _memo_put(key, governing_law)
         return governing_law
         
-    except Exception as e:
-        print(f"Error in governing law detection: {e}")
+    except Exception:
+        logger.exception("Error in governing law detection")
         return "Unknown"
 
 
-def extract_key_clauses_llm(text: str) -> Dict[str, ClauseInfo]:
+async def _extract_key_clauses_chunk(chunk: str, model_name: str) -> Dict[str, ClauseInfo]:
+    """Extract key clauses from one chunk of the contract."""
+    key_clauses = await _cached_ainvoke(_CLAUSES_PROMPT.format_prompt(text=chunk), model_name, KeyClauses)
+    
+    return {
+        clause.clause_type: clause.clause_info()
+        for clause in key_clauses.clauses
+        if clause.text
+    }
+
+
+async def extract_key_clauses_llm(text: str, model_name: str = EXTRACTION_MODEL) -> Dict[str, ClauseInfo]:
     """
     Extract key clauses using LLM.
     
     Args:
         text: Contract text content
+        model_name: OpenAI model to use
         
     Returns:
         Dict[str, ClauseInfo]: Dictionary of clause types and their information
     """
     try:
-        # For longer texts, we might need to process in chunks
-        # For now, limit to first 6000 characters
-        text_sample = text[:6000] if len(text) > 6000 else text
-        
-        prompt = ChatPromptTemplate.from_template(KEY_CLAUSES_EXTRACTION_PROMPT)
-        response = model.invoke(prompt.format(text=text_sample))
-        
-        # Parse JSON response
-        try:
-            clauses_data = json.loads(response.content)
-            clauses = {}
-            
-            for clause_type, clause_info in clauses_data.items():
-                if isinstance(clause_info, dict) and "text" in clause_info:
-                    clauses[clause_type] = ClauseInfo(
-                        text=clause_info.get("text", ""),
-                        summary=clause_info.get("summary", "")
-                    )
-            
-            return clauses
+        # Every chunk is searched concurrently so clauses late in long contracts are found
+        clause_maps = await asyncio.gather(
+            *(_extract_key_clauses_chunk(chunk, model_name) for chunk in split_text_chunks(text))
+        )
+        return merge_clauses(clause_maps)
             
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {e}")
-            print(f"Response content: {response.content}")
-            return {}
-            
-    except Exception as e:
-        print(f"Error in key clauses extraction: {e}")
+    except Exception:
+        logger.exception("Error in key clauses extraction")
         return {}
 
 
-def assess_clause_risk_llm(clause_text: str, contract_type: str, governing_law: str) -> Optional[ClauseRiskAssessment]:
+async def assess_clause_risk_llm(clause_text: str, contract_type: str, governing_law: str, model_name: Optional[str] = None) -> Optional[ClauseRiskAssessment]:
     """
     Assess risk level of a specific clause using LLM.
     
@@ -152,90 +364,126 @@ def assess_clause_risk_llm(clause_text: str, contract_type: str, governing_law:
         clause_text: Text of the clause to assess
         contract_type: Type of contract
         governing_law: Governing law
+        model_name: OpenAI model to use; by default long clauses get the
+            stronger model
         
     Returns:
         ClauseRiskAssessment: Risk assessment or None if failed
     """
     try:
-        prompt = ChatPromptTemplate.from_template(CLAUSE_RISK_ASSESSMENT_PROMPT)
-        response = model.invoke(prompt.format(
+        return await _cached_ainvoke(_RISK_PROMPT.format_prompt(
             clause_text=clause_text,
             contract_type=contract_type,
             governing_law=governing_law
-        ))
+        ), model_name or risk_model_name(clause_text), ClauseRiskAssessment)
         
-        # Parse JSON response
-        try:
-            response_content = response.content.strip()
-            
-            # Try to extract JSON if it's embedded in other text
-            if "{" in response_content and "}" in response_content:
-                start = response_content.find("{")
-                end = response_content.rfind("}") + 1
-                json_str = response_content[start:end]
-                assessment_data = json.loads(json_str)
-            else:
-                assessment_data = json.loads(response_content)
-            
-            return ClauseRiskAssessment(
-                risk_level=assessment_data.get("risk_level", "medium"),
-                issues=assessment_data.get("issues", []),
-                recommendations=assessment_data.get("recommendations", []),
-                explanation=assessment_data.get("explanation", "")
-            )
-            
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Error parsing risk assessment JSON: {e}")
-            print(f"Response content: {response.content}")
-            # Return a default assessment instead of None
-            return ClauseRiskAssessment(
-                risk_level="medium",
-                issues=["Unable to parse detailed risk assessment"],
-                recommendations=["Review this clause manually"],
-                explanation="Automated risk assessment failed"
-            )
-            
-    except Exception as e:
-        print(f"Error in clause risk assessment: {e}")
+    except Exception:
+        logger.exception("Error in clause risk assessment")
         return None
 
 
-def analyze_contract_comprehensive(text: str) -> Dict:
+async def assess_clause_risks_batch_llm(clauses: Dict[str, str], contract_type: str, governing_law: str, model_name: Optional[str] = None) -> Dict[str, ClauseRiskAssessment]:
+    """
+    Assess the risk of several clauses with a single LLM call.
+    
+    Args:
+        clauses: Clause texts keyed by clause type
+        contract_type: Type of contract
+        governing_law: Governing law
+        model_name: OpenAI model to use; by default the stronger model is
+            used if any clause is long
+        
+    Returns:
+        Dict[str, ClauseRiskAssessment]: Assessments keyed by clause type;
+            clauses the model did not assess are omitted
+    """
+    if not clauses:
+        return {}
+    
+    try:
+        clauses_text = "\n\n".join(
+            f"### {clause_type}\n{clause_text}" for clause_type, clause_text in clauses.items()
+        )
+        
+        batch = await _cached_ainvoke(RISK_BATCH_CHAT_PROMPT.format_prompt(
+            clauses=clauses_text,
+            contract_type=contract_type,
+            governing_law=governing_law
+        ), model_name or risk_model_name(max(clauses.values(), key=len)), ClauseRiskBatch)
+        
+        return {
+            result.clause_type: result
+            for result in batch.results
+            if result.clause_type in clauses
+        }
+        
+    except Exception:
+        logger.exception("Error in batched clause risk assessment")
+        return {}
+
+
+async def analyze_contract_comprehensive(text: str, on_progress: Optional[Callable[[str], None]] = None) -> Dict:
     """
     Perform comprehensive contract analysis using LLM.
     
     Args:
         text: Contract text content
+        on_progress: Called with a short message as each step starts, e.g.
+            to update a Streamlit status label
         
     Returns:
         Dict: Comprehensive analysis results
     """
-    print("🤖 Starting LLM-based contract analysis...")
+    def report(message: str) -> None:
+        logger.debug(message)
+        if on_progress is not None:
+            on_progress(message)
     
-    # Step 1: Detect contract type
-    print("📋 Detecting contract type...")
-    contract_type = detect_contract_type_llm(text)
+    # Created per run: asyncio primitives are bound to the running event loop
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
     
-    # Step 2: Detect governing law
-    print("⚖️ Detecting governing law...")
-    governing_law = detect_governing_law_llm(text)
+    async def extract_chunk(chunk: str) -> Dict[str, ClauseInfo]:
+        try:
+            return await bounded(semaphore, _extract_key_clauses_chunk(chunk, EXTRACTION_MODEL))
+        except Exception:
+            logger.exception("Error in key clauses extraction")
+            return {}
     
-    # Step 3: Extract key clauses
-    print("🔍 Extracting key clauses...")
-    key_clauses = extract_key_clauses_llm(text)
+    # Steps 1-3: Classify the contract type and governing law on the fast
+    # model while the extraction model pulls key clauses from every chunk
+    chunks = split_text_chunks(text)
+    report(f"📋 Detecting contract type and governing law and extracting key clauses from {len(chunks)} chunks...")
+    contract_type, governing_law, clause_maps = await asyncio.gather(
+        detect_contract_type_llm(text, semaphore=semaphore),
+        detect_governing_law_llm(text, semaphore=semaphore),
+        asyncio.gather(*(extract_chunk(chunk) for chunk in chunks))
+    )
+    key_clauses = merge_clauses(clause_maps)
     
-    # Step 4: Assess risks for each clause (optional, can be resource intensive)
+    # Step 4: Assess risks for all substantial clauses, a few clauses per call.
+    # Clauses already rated low risk during extraction skip the extra call.
     clause_risks = {}
+    substantial_clauses = []
     for clause_type, clause_info in key_clauses.items():
-        if len(clause_info.text) > 100:  # Only assess substantial clauses
-            print(f"⚠️ Assessing risk for {clause_type} clause...")
-            risk_assessment = assess_clause_risk_llm(
-                clause_info.text, 
-                contract_type, 
-                governing_law
-            )
-            if risk_assessment:
-                clause_risks[clause_type] = risk_assessment
+        if len(clause_info.text) <= 100:
+            continue
+        if clause_info.preliminary_risk == "low":
+            clause_risks[clause_type] = low_risk_assessment()
+        else:
+            substantial_clauses.append((clause_type, clause_info.text))
+    report(f"⚠️ Assessing risk for {len(substantial_clauses)} clauses...")
+    results = await asyncio.gather(
+        *(
+            bounded(semaphore, assess_clause_risks_batch_llm(batch, contract_type, governing_law, model_name))
+            for model_name, batch in risk_batches(substantial_clauses)
+        ),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.error("Error in batched clause risk assessment", exc_info=result)
+            continue
+        clause_risks.update(result)
     
     return {
         "contract_type": contract_type,
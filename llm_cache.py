@@ -0,0 +1,93 @@
+"""
+Persistent cache for deterministic LLM responses.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Optional, Type
+import diskcache
+from langchain_core.prompt_values import PromptValue
+from pydantic import BaseModel
+
+CACHE_DIRECTORY = "./.llm_cache"
+
+# Cached responses expire after 30 days
+CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+class LLMCache:
+    """
+    Disk-backed cache of LLM responses keyed by model, prompt and output schema.
+
+    Only temperature-0 calls are cached: they return the same output for the
+    same input, so re-analyzing a contract that was seen before costs nothing.
+    """
+
+    def __init__(self, directory: str = CACHE_DIRECTORY, ttl: int = CACHE_TTL_SECONDS):
+        self._cache = diskcache.Cache(directory)
+        self._ttl = ttl
+
+    @staticmethod
+    def key(model_name: str, prompt: str, schema: Optional[Type[BaseModel]] = None) -> str:
+        """
+        Cache key for a model, the fully formatted prompt sent to it and the
+        structured output schema, if any.
+
+        The schema enters as its JSON schema, so changing a response model
+        invalidates the responses parsed into its old shape. Parts are
+        NUL-separated so that no two different inputs join to the same string.
+        """
+        schema_json = "" if schema is None else json.dumps(schema.model_json_schema(), sort_keys=True)
+        return hashlib.sha256("\0".join([model_name, schema_json, prompt]).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for key, or None."""
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a response under key until the TTL runs out."""
+        self._cache.set(key, value, expire=self._ttl)
+
+    async def ainvoke(
+        self,
+        runnable,
+        prompt: PromptValue,
+        model_name: str,
+        schema: Optional[Type[BaseModel]] = None,
+        temperature: float = 0
+    ) -> Any:
+        """
+        Invoke runnable with prompt, answering from the cache when possible.
+
+        Args:
+            runnable: Chat model or structured-output runnable to call on a miss
+            prompt: Fully formatted prompt; its string form is part of the cache key
+            model_name: Name of the underlying model, part of the cache key
+            schema: Structured output schema runnable is bound to, part of the cache key
+            temperature: Sampling temperature; non-zero temperatures bypass the cache
+
+        Returns:
+            Any: The runnable's response
+        """
+        if temperature > 0:
+            return await runnable.ainvoke(prompt)
+
+        key = self.key(model_name, prompt.to_string(), schema)
+        if (hit := self.get(key)) is not None:
+            return hit
+
+        response = await runnable.ainvoke(prompt)
+        self.set(key, response)
+        return response
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache() -> LLMCache:
+    """
+    Return the process-wide LLM response cache, opening it on first use.
+
+    Returns:
+        LLMCache: Shared response cache
+    """
+    return LLMCache()
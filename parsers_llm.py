@@ -3,16 +3,14 @@ Document parsers with LLM-based analysis instead of regex patterns.
 """
 
 import fitz  # PyMuPDF
-import pdfplumber
-import PyPDF2
 from docx import Document
-import docx2txt
 import re
-import markdown
-from bs4 import BeautifulSoup
-from typing import IO, Optional, Dict
+from charset_normalizer import from_bytes
+from typing import IO, Optional, Dict, List, Tuple, Callable
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import io
 import logging
+from clients import run_async
 from llm_analyzer import (
     detect_contract_type_llm,
     detect_governing_law_llm,
@@ -24,6 +22,18 @@ from llm_analyzer import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Patterns used by clean_text, compiled once
+_RE_FF = re.compile(r'\r\n?|\f')
+_RE_WS = re.compile(r'[ \t]+')
+_RE_LINE_WS = re.compile(r' ?\n ?')
+_RE_CASE = re.compile(r'([a-z])([A-Z])')
+_RE_DOT = re.compile(r'(\.)([A-Z])')
+_RE_NL = re.compile(r'\n{3,}')
+
+# Fallback extractors for one file run side by side; the parsing libraries
+# spend most of their time in C code that releases the GIL
+_extractor_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="extract")
+
 
 def extract_text_from_pdf_pymupdf(file_obj: IO) -> str:
     """Extract text using PyMuPDF (fitz)."""
@@ -40,14 +50,16 @@ def extract_text_from_pdf_pymupdf(file_obj: IO) -> str:
 def extract_text_from_pdf_pdfplumber(file_obj: IO) -> str:
     """Extract text using pdfplumber."""
     try:
+        import pdfplumber  # Fallback only; imported on first use
+        
         file_obj.seek(0)
         with pdfplumber.open(file_obj) as pdf:
-            text = ""
+            parts = []
             for page in pdf.pages:
                 page_text = page.extract_text()
                 if page_text:
-                    text += page_text + "\n"
-        return text
+                    parts.append(page_text)
+        return "\n".join(parts)
     except Exception as e:
         logger.warning(f"pdfplumber extraction failed: {e}")
         return ""
@@ -56,12 +68,14 @@ def extract_text_from_pdf_pdfplumber(file_obj: IO) -> str:
 def extract_text_from_pdf_pypdf2(file_obj: IO) -> str:
     """Extract text using PyPDF2."""
     try:
+        import PyPDF2  # Fallback only; imported on first use
+        
         file_obj.seek(0)
         pdf_reader = PyPDF2.PdfReader(file_obj)
-        text = ""
+        parts = []
         for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+            parts.append(page.extract_text() or "")
+        return "\n".join(parts)
     except Exception as e:
         logger.warning(f"PyPDF2 extraction failed: {e}")
         return ""
@@ -82,6 +96,8 @@ def extract_text_from_docx_python_docx(file_obj: IO) -> str:
 def extract_text_from_docx_docx2txt(file_obj: IO) -> str:
     """Extract text using docx2txt."""
     try:
+        import docx2txt  # Fallback only; imported on first use
+        
         file_obj.seek(0)
         text = docx2txt.process(file_obj)
         return text if text else ""
@@ -90,65 +106,115 @@ def extract_text_from_docx_docx2txt(file_obj: IO) -> str:
         return ""
 
 
-def extract_text(file_obj: IO) -> str:
+def _extract_first_non_empty(methods: List[Tuple[str, Callable[[IO], str]]], data: bytes) -> Tuple[str, Optional[str]]:
+    """
+    Run extraction methods concurrently and return the first non-empty result.
+    
+    Args:
+        methods: (name, extractor) pairs, in order of preference for results
+            that finish together
+        data: File content
+        
+    Returns:
+        Tuple[str, Optional[str]]: Extracted text and the name of the method
+            that produced it, or ("", None) if every method came back empty
+    """
+    futures = [_extractor_pool.submit(method_func, io.BytesIO(data)) for _, method_func in methods]
+    names = {future: method_name for future, (method_name, _) in zip(futures, methods)}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=futures.index):
+                text = future.result()
+                if text.strip():
+                    logger.info(f"Successfully extracted text using {names[future]}")
+                    return text, names[future]
+                logger.warning(f"{names[future]} returned empty text")
+    finally:
+        # Extractors that have not started yet are skipped; running ones finish in the background
+        for future in pending:
+            future.cancel()
+    return "", None
+
+
+def extract_text(file_obj: IO) -> Tuple[str, Dict]:
     """
     Extract text from uploaded file with multiple fallback methods.
     
+    The file's bytes are read exactly once; every extractor works on its own
+    in-memory copy so the uploaded file handle is never touched again.
+    
     Args:
         file_obj: File object from Streamlit file uploader
         
     Returns:
-        str: Extracted text content
+        Tuple[str, Dict]: Extracted text content and file metadata
     """
-    suffix = file_obj.name.split(".")[-1].lower()
+    data = file_obj.getvalue() if hasattr(file_obj, "getvalue") else file_obj.read()
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return extract_text_from_bytes(data, file_obj.name)
+
+
+def extract_text_from_bytes(data: bytes, filename: str) -> Tuple[str, Dict]:
+    """
+    Extract text from raw file bytes with multiple fallback methods.
+    
+    Args:
+        data: File content
+        filename: Original file name, used to pick the extractor
+        
+    Returns:
+        Tuple[str, Dict]: Extracted text content and file metadata
+            (filename, size in bytes, and the extraction method used)
+    """
+    suffix = filename.split(".")[-1].lower()
     text = ""
+    method_used = None
     
     if suffix == "pdf":
-        # Try multiple PDF extraction methods
+        # PyMuPDF handles born-digital PDFs quickly; the slower fallbacks
+        # only run, concurrently, when it finds no text
         methods = [
-            ("PyMuPDF", extract_text_from_pdf_pymupdf),
+            ("PyMuPDF", extract_text_from_pdf_pymupdf)
+        ]
+        fallbacks = [
             ("pdfplumber", extract_text_from_pdf_pdfplumber),
             ("PyPDF2", extract_text_from_pdf_pypdf2)
         ]
-        
-        for method_name, method_func in methods:
-            file_obj.seek(0)
-            text = method_func(file_obj)
-            if text.strip():
-                logger.info(f"Successfully extracted text using {method_name}")
-                break
-            else:
-                logger.warning(f"{method_name} returned empty text")
+        text, method_used = _extract_first_non_empty(methods, data)
+        if method_used is None:
+            text, method_used = _extract_first_non_empty(fallbacks, data)
                 
     elif suffix == "docx":
-        # Try multiple DOCX extraction methods
+        # python-docx first; docx2txt only if it finds no text
         methods = [
-            ("python-docx", extract_text_from_docx_python_docx),
+            ("python-docx", extract_text_from_docx_python_docx)
+        ]
+        fallbacks = [
             ("docx2txt", extract_text_from_docx_docx2txt)
         ]
-        
-        for method_name, method_func in methods:
-            file_obj.seek(0)
-            text = method_func(file_obj)
-            if text.strip():
-                logger.info(f"Successfully extracted text using {method_name}")
-                break
-            else:
-                logger.warning(f"{method_name} returned empty text")
+        text, method_used = _extract_first_non_empty(methods, data)
+        if method_used is None:
+            text, method_used = _extract_first_non_empty(fallbacks, data)
                 
     elif suffix == "txt":
-        try:
-            file_obj.seek(0)
-            text = file_obj.read().decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                file_obj.seek(0)
-                text = file_obj.read().decode('latin-1')
-            except Exception as e:
-                logger.error(f"Failed to decode text file: {e}")
-                text = ""
+        # Detect the encoding once instead of guessing, so cp1252 and other
+        # legacy encodings decode without mojibake
+        match = from_bytes(data).best()
+        if match is not None:
+            text = str(match)
+            method_used = match.encoding
+        else:
+            logger.error("Failed to detect text file encoding")
     
-    return text.strip()
+    meta = {
+        "filename": filename,
+        "size": len(data),
+        "method": method_used
+    }
+    return text.strip(), meta
 
 
 def convert_text_to_markdown(text: str, title: Optional[str] = None) -> str:
@@ -205,18 +271,19 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
+    # Normalize line endings and turn page breaks and form feeds into newlines
+    text = _RE_FF.sub('\n', text)
     
-    # Remove page breaks and form feeds
-    text = re.sub(r'[\f\r]+', '\n', text)
+    # Collapse runs of spaces and tabs, keeping line breaks so paragraphs survive
+    text = _RE_WS.sub(' ', text)
+    text = _RE_LINE_WS.sub('\n', text)
     
     # Fix common OCR issues
-    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)  # Add space between lowercase and uppercase
-    text = re.sub(r'(\.)([A-Z])', r'\1 \2', text)     # Add space after period before uppercase
+    text = _RE_CASE.sub(r'\1 \2', text)  # Add space between lowercase and uppercase
+    text = _RE_DOT.sub(r'\1 \2', text)    # Add space after period before uppercase
     
     # Remove extra newlines but preserve paragraph breaks
-    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    text = _RE_NL.sub('\n\n', text)
     
     return text.strip()
 
@@ -232,7 +299,7 @@ def detect_contract_type(text: str) -> str:
     Returns:
         str: Detected contract type
     """
-    return detect_contract_type_llm(text)
+    return run_async(detect_contract_type_llm(text))
 
 
 def detect_country(text: str) -> str:
@@ -245,7 +312,7 @@ def detect_country(text: str) -> str:
     Returns:
         str: Detected country or "Unknown"
     """
-    return detect_governing_law_llm(text)
+    return run_async(detect_governing_law_llm(text))
 
 
 def extract_key_clauses(text: str) -> Dict:
@@ -258,7 +325,7 @@ def extract_key_clauses(text: str) -> Dict:
     Returns:
         Dict: Dictionary of clause types and their information
     """
-    clauses_info = extract_key_clauses_llm(text)
+    clauses_info = run_async(extract_key_clauses_llm(text))
     
     # Convert to format expected by the UI
     clauses = {}
@@ -268,14 +335,29 @@ def extract_key_clauses(text: str) -> Dict:
     return clauses
 
 
-def analyze_contract_full(text: str) -> Dict:
+def analyze_contract_full(text: str, on_progress: Optional[Callable[[str], None]] = None) -> Dict:
     """
     Perform full contract analysis using LLM.
     
     Args:
         text: Contract text content
+        on_progress: Called with a short message as each analysis step starts
+        
+    Returns:
+        Dict: Complete analysis results
+    """
+    return run_async(analyze_contract_full_async(text, on_progress))
+
+
+async def analyze_contract_full_async(text: str, on_progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Perform full contract analysis using LLM without blocking the event loop.
+    
+    Args:
+        text: Contract text content
+        on_progress: Called with a short message as each analysis step starts
         
     Returns:
         Dict: Complete analysis results
     """
-    return analyze_contract_comprehensive(text)
+    return await analyze_contract_comprehensive(text, on_progress)
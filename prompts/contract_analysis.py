@@ -1,12 +1,54 @@
 """
 LLM prompts for contract analysis tasks.
+
+Each prompt is split into a static system prompt and a short user prompt that
+carries the per-contract values. Every system prompt opens with the same
+reference section and is longer than 1024 tokens, so OpenAI's automatic
+prompt caching serves the shared prefix from cache on repeated calls.
+"""
+
+CONTRACT_REFERENCE = """CONTRACT REFERENCE
+
+Contract types:
+- NDA (Non-Disclosure Agreement): an agreement whose main purpose is to protect confidential information exchanged between the parties. Typical provisions define confidential information, permitted use and disclosure, exclusions (public or independently developed information), the duration of the obligations, and the return or destruction of materials.
+- DPA (Data Processing Agreement): an agreement, usually between a controller and a processor, governing the processing of personal data. Typical provisions cover processing instructions, security measures, sub-processors, data subject rights, breach notification, international transfers, and audit rights.
+- Employment (Employment Contract): an agreement between an employer and an individual employee. Typical provisions cover role and duties, compensation and benefits, working hours, probation, notice periods, post-employment restrictions, and assignment of inventions.
+- MSA (Master Service Agreement): a framework agreement setting the general terms for services delivered under separate statements of work or orders. Typical provisions cover ordering, acceptance, fees, warranties, liability caps, and termination of the framework and of individual orders.
+- SLA (Service Level Agreement): an agreement, or schedule, defining measurable service levels. Typical provisions cover availability targets, response and resolution times, measurement and reporting, service credits, and exclusions such as scheduled maintenance.
+- License (License Agreement): an agreement granting rights to use software, content, patents, trademarks or other intellectual property. Typical provisions cover the scope of the grant, restrictions, royalties or fees, ownership, and audit rights.
+- Purchase (Purchase Agreement): an agreement for the sale of goods or assets. Typical provisions cover price, delivery, transfer of title and risk, inspection and acceptance, warranties, and remedies for defective goods.
+- Lease (Lease Agreement): an agreement granting use of real estate or equipment for a period in exchange for rent. Typical provisions cover the term, rent and deposits, maintenance and repairs, permitted use, subletting, and surrender.
+- Commercial (General Commercial Contract): any other business agreement that does not fit the categories above, such as distribution, agency, reseller, partnership or supply agreements.
+
+Clause types:
+- termination: how and when the agreement ends. Includes the term and renewal, termination for convenience, termination for cause or material breach, cure periods, notice requirements, and the consequences of termination such as survival of obligations and return of property.
+- liability: who bears losses and up to what amount. Includes limitation of liability, liability caps, exclusions of indirect, consequential or punitive damages, and carve-outs from the cap for fraud, gross negligence, wilful misconduct or breach of confidentiality.
+- indemnification: promises by one party to defend and hold the other harmless against third-party claims. Includes the covered claims (for example intellectual property infringement, data breaches or bodily injury), the defence and settlement procedure, and any limits on the indemnity.
+- confidentiality: obligations to keep information secret. Includes the definition of confidential information, permitted disclosures to employees and advisers, compelled disclosure by law, standard exclusions, the duration of the obligation, and return or destruction of information.
+- governing_law: the law that governs the agreement and the courts that have jurisdiction over disputes. Look for phrases such as "governed by the laws of", "subject to the laws of", "jurisdiction of" and "courts of".
+- payment_terms: fees and how they are paid. Includes prices, invoicing schedules, payment deadlines, late payment interest, taxes, expenses, price increases, and the right to suspend performance for non-payment.
+- intellectual_property: ownership and use of intellectual property. Includes ownership of pre-existing and newly created work, assignment of rights, licences granted between the parties, moral rights, and restrictions on reverse engineering.
+- force_majeure: relief from performance for events beyond a party's reasonable control, such as natural disasters, war, epidemics or government action. Includes the events covered, notice and mitigation duties, suspension of obligations, and the right to terminate after a prolonged event.
+- dispute_resolution: how disputes are resolved. Includes escalation between the parties, mediation, arbitration (seat, rules and number of arbitrators), court litigation, waiver of jury trial, and injunctive relief.
+- non_compete: restrictions on competing or soliciting. Includes non-competition, non-solicitation of customers or employees, no-hire clauses, exclusivity, and the duration and geographic scope of each restriction.
+
+Risk levels:
+- high: the clause exposes a party to significant or unlimited financial, legal or operational risk, is heavily one-sided, or is likely to be unenforceable or non-compliant under the governing law. It should be negotiated before signing.
+- medium: the clause departs from common market practice or is ambiguous in a way that could cause disputes. It should be reviewed and ideally clarified.
+- low: the clause is standard and balanced, with at most minor drafting improvements to suggest.
+
 """
 
-CONTRACT_TYPE_DETECTION_PROMPT = """You are an expert contract analyst. Analyze the following contract text and determine its type.
+# User prompt for tasks whose only input is contract text
+CONTRACT_TEXT_USER_PROMPT = "{text}"
+
+CONTRACT_TYPE_DETECTION_PROMPT = CONTRACT_REFERENCE + """TASK
+
+You are an expert contract analyst. Analyze the contract text provided by the user and determine its type.
 
 Contract types to consider:
 - NDA (Non-Disclosure Agreement)
-- DPA (Data Processing Agreement) 
+- DPA (Data Processing Agreement)
 - Employment (Employment Contract)
 - MSA (Master Service Agreement)
 - SLA (Service Level Agreement)
@@ -15,14 +57,11 @@ Contract types to consider:
 - Lease (Lease Agreement)
 - Commercial (General Commercial Contract)
 
-Return only the contract type from the list above, nothing else.
-
-Contract text:
-{text}
+Return only the contract type from the list above, nothing else."""
 
-Contract type:"""
+GOVERNING_LAW_DETECTION_PROMPT = CONTRACT_REFERENCE + """TASK
 
-GOVERNING_LAW_DETECTION_PROMPT = """You are an expert contract analyst. Analyze the following contract text and identify the governing law or jurisdiction.
+You are an expert contract analyst. Analyze the contract text provided by the user and identify the governing law or jurisdiction.
 
 Look for phrases like:
 - "governed by the laws of"
@@ -30,14 +69,11 @@ Look for phrases like:
 - "jurisdiction of"
 - "courts of"
 
-Return only the country or jurisdiction name (e.g., "United States", "United Kingdom", "California", "Delaware"). If no governing law is mentioned, return "Unknown".
+Return only the country or jurisdiction name (e.g., "United States", "United Kingdom", "California", "Delaware"). If no governing law is mentioned, return "Unknown"."""
 
-Contract text:
-{text}
+KEY_CLAUSES_EXTRACTION_PROMPT = CONTRACT_REFERENCE + """TASK
 
-Governing law:"""
-
-KEY_CLAUSES_EXTRACTION_PROMPT = """You are an expert contract analyst. Analyze the following contract text and extract key clauses.
+You are an expert contract analyst. Analyze the contract text provided by the user and extract key clauses.
 
 Identify and extract the following types of clauses if present:
 1. Termination clauses
@@ -51,26 +87,40 @@ Identify and extract the following types of clauses if present:
 9. Dispute resolution clauses
 10. Non-compete/Non-solicitation clauses
 
-For each clause type found, provide:
+For each clause found, provide:
+- Its clause type, using the clause type names from the reference above
 - The exact text of the clause
 - A brief summary of what it covers
+- A preliminary risk level (high, medium, or low), using the risk levels from the reference above. Use low only for clearly standard, balanced clauses; they will not be reviewed further.
 
-Return your response as a JSON object with this structure:
-{{
-    "clause_type": {{
-        "text": "exact clause text",
-        "summary": "brief summary of the clause"
-    }}
-}}
+If no clauses of a particular type are found, omit that clause type from the response."""
 
-If no clauses of a particular type are found, omit that clause type from the response.
+CLAUSE_RISK_ASSESSMENT_PROMPT = CONTRACT_REFERENCE + """TASK
 
-Contract text:
-{text}
+You are an expert contract attorney. Analyze the contract clause provided by the user and assess its risk level and potential issues.
 
-Key clauses (JSON format):"""
+Consider:
+- Unusual or one-sided terms
+- Missing standard protections
+- Overly broad language
+- Compliance issues
+- Industry best practices
+
+Provide your assessment with:
+- risk_level: high, medium, or low
+- issues: list of specific issues
+- recommendations: list of recommended changes
+- explanation: detailed explanation of the assessment"""
+
+CLAUSE_RISK_ASSESSMENT_USER_PROMPT = """Contract type: {contract_type}
+Governing law: {governing_law}
+
+Clause text:
+{clause_text}"""
 
-CLAUSE_RISK_ASSESSMENT_PROMPT = """You are an expert contract attorney. Analyze the following contract clause and assess its risk level and potential issues.
+CLAUSE_RISK_BATCH_ASSESSMENT_PROMPT = CONTRACT_REFERENCE + """TASK
+
+You are an expert contract attorney. Analyze each of the contract clauses provided by the user and assess its risk level and potential issues.
 
 Consider:
 - Unusual or one-sided terms
@@ -79,18 +129,24 @@ Consider:
 - Compliance issues
 - Industry best practices
 
-Clause text:
-{clause_text}
+Return one assessment per clause, using the clause type exactly as given, with:
+- risk_level: high, medium, or low
+- issues: list of specific issues
+- recommendations: list of recommended changes
+- explanation: detailed explanation of the assessment"""
 
-Contract type: {contract_type}
+CLAUSE_RISK_BATCH_ASSESSMENT_USER_PROMPT = """Contract type: {contract_type}
 Governing law: {governing_law}
 
-Provide your assessment in JSON format:
-{{
-    "risk_level": "high|medium|low",
-    "issues": ["list of specific issues"],
-    "recommendations": ["list of recommended changes"],
-    "explanation": "detailed explanation of the assessment"
-}}
+Clauses (each introduced by its clause type):
+{clauses}"""
+
+CONTRACT_OVERVIEW_PROMPT = CONTRACT_REFERENCE + """TASK
+
+You are an expert contract analyst. Analyze the contract text provided by the user and determine its type, its governing law, and its key clauses.
+
+1. Contract type. Choose exactly one of: NDA, DPA, Employment, MSA, SLA, License, Purchase, Lease, Commercial.
+
+2. Governing law. Give only the country or jurisdiction name (e.g., "United States", "United Kingdom", "California", "Delaware"). If no governing law is mentioned, use "Unknown".
 
-Risk assessment:"""
+3. Key clauses. Identify and extract clauses of the clause types listed in the reference above, using those clause type names. For each clause found, give its clause type, the exact text of the clause, a brief summary of what it covers, and a preliminary risk level (high, medium, or low) using the risk levels in the reference above. Use low only for clearly standard, balanced clauses; they will not be reviewed further. Omit clause types that are not present."""
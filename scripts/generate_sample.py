@@ -0,0 +1,61 @@
+"""
+Regenerate the precomputed sample NDA analysis shown on the Home page.
+
+Runs the full LLM pipeline once on assets/sample_nda.txt and writes the
+result to assets/sample_nda_analysis.json, so the "Load Sample NDA" demo
+renders without any API calls. Until the asset exists, the demo runs the
+live pipeline instead. Needs OPENAI_API_KEY.
+
+Usage:
+    python scripts/generate_sample.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from parsers_llm import analyze_contract_full  # noqa: E402
+from exa_search import search_regulatory_hints  # noqa: E402
+from chain import analysis_error_risk, llm_review  # noqa: E402
+
+SAMPLE_TEXT_PATH = ROOT / "assets" / "sample_nda.txt"
+OUTPUT_PATH = ROOT / "assets" / "sample_nda_analysis.json"
+
+
+def main():
+    """Run the pipeline on the sample NDA and write the JSON asset."""
+    sample_text = SAMPLE_TEXT_PATH.read_text(encoding="utf-8").strip()
+    analysis = analyze_contract_full(sample_text)
+    contract_type = analysis.get("contract_type", "Commercial")
+    governing_law = analysis.get("governing_law", "Unknown")
+    regulatory_hints = search_regulatory_hints(contract_type, governing_law)
+    risks = llm_review(sample_text, contract_type, governing_law, regulatory_hints)
+    if analysis_error_risk() in risks:
+        sys.exit("The risk review failed; not writing the sample analysis")
+    
+    data = {
+        "text": sample_text,
+        "contract_type": contract_type,
+        "governing_law": governing_law,
+        "key_clauses": {
+            clause_type: clause_info.model_dump()
+            for clause_type, clause_info in analysis.get("key_clauses", {}).items()
+        },
+        "clause_risks": {
+            clause_type: assessment.model_dump()
+            for clause_type, assessment in analysis.get("clause_risks", {}).items()
+        },
+        "regulatory_hints": list(regulatory_hints),
+        "risks": [risk.model_dump() for risk in risks]
+    }
+    
+    OUTPUT_PATH.parent.mkdir(exist_ok=True)
+    OUTPUT_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"Wrote {OUTPUT_PATH.relative_to(ROOT)} ({len(risks)} risks)")
+
+
+if __name__ == "__main__":
+    main()
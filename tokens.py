@@ -0,0 +1,37 @@
+"""
+Token-aware text windowing for LLM prompts.
+"""
+
+from typing import List
+import tiktoken
+
+# Tokenizer matching the chat model, loaded once per process
+encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens in text."""
+    return len(encoding.encode(text))
+
+
+def token_windows(text: str, window_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """
+    Split text into overlapping windows of at most window_tokens tokens.
+    
+    Args:
+        text: Text to split
+        window_tokens: Maximum tokens per window
+        overlap_tokens: Tokens shared between consecutive windows
+        
+    Returns:
+        List[str]: Windows covering the whole text, in order
+    """
+    tokens = encoding.encode(text)
+    if len(tokens) <= window_tokens:
+        return [text]
+    
+    step = window_tokens - overlap_tokens
+    return [
+        encoding.decode(tokens[start:start + window_tokens])
+        for start in range(0, len(tokens) - overlap_tokens, step)
+    ]